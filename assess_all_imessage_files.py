@@ -14,53 +14,127 @@ It shows:
 This is read-only and completely safe - it doesn't modify anything.
 """
 
+import os
 import sys
+import argparse
+import heapq
+from bisect import bisect_right
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Configuration
 ATTACHMENTS_DIR = Path.home() / 'Library' / 'Messages' / 'Attachments'
 
+# Threads used to walk and stat the attachments tree
+DEFAULT_STAT_THREADS = 32
+
+# Units for format_size, each 1024x the previous
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# File size distribution buckets: bucket i holds sizes below threshold i (in bytes)
+SIZE_BUCKET_THRESHOLDS = [1 << 20, 10 << 20, 50 << 20, 100 << 20, 500 << 20]
+SIZE_BUCKET_NAMES = ['< 1 MB', '1-10 MB', '10-50 MB', '50-100 MB', '100-500 MB', '500+ MB']
+
+# Extension -> category lookup, built once so categorizing a file is a single dict hit
+VIDEO_EXTS = frozenset({'.mov', '.mp4', '.m4v', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.mpeg', '.mpg'})
+IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.heic', '.heif', '.bmp', '.tiff', '.webp', '.svg'})
+AUDIO_EXTS = frozenset({'.mp3', '.m4a', '.wav', '.aac', '.flac', '.ogg', '.wma', '.aiff'})
+DOCUMENT_EXTS = frozenset({'.pdf', '.doc', '.docx', '.txt', '.rtf', '.pages', '.odt'})
+ARCHIVE_EXTS = frozenset({'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'})
+
+EXT_TO_CATEGORY = {}
+for _exts, _category in [(VIDEO_EXTS, 'Video'), (IMAGE_EXTS, 'Image'), (AUDIO_EXTS, 'Audio'),
+                         (DOCUMENT_EXTS, 'Document'), (ARCHIVE_EXTS, 'Archive')]:
+    EXT_TO_CATEGORY.update(dict.fromkeys(_exts, _category))
+
 
 def format_size(bytes_size):
     """Format bytes to human-readable size"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024.0:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024.0
-    return f"{bytes_size:.1f} TB"
-
-
-def categorize_file(extension):
-    """Categorize file by extension into broader categories"""
-    ext = extension.lower()
-
-    video_exts = {'.mov', '.mp4', '.m4v', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.mpeg', '.mpg'}
-    image_exts = {'.jpg', '.jpeg', '.png', '.gif', '.heic', '.heif', '.bmp', '.tiff', '.webp', '.svg'}
-    audio_exts = {'.mp3', '.m4a', '.wav', '.aac', '.flac', '.ogg', '.wma', '.aiff'}
-    document_exts = {'.pdf', '.doc', '.docx', '.txt', '.rtf', '.pages', '.odt'}
-    archive_exts = {'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'}
-
-    if ext in video_exts:
-        return 'Video'
-    elif ext in image_exts:
-        return 'Image'
-    elif ext in audio_exts:
-        return 'Audio'
-    elif ext in document_exts:
-        return 'Document'
-    elif ext in archive_exts:
-        return 'Archive'
-    elif ext == '.ds_store':
-        return 'System'
-    elif not ext:
-        return 'No Extension'
-    else:
-        return 'Other'
+    # Each unit is 10 more bits, so the bit length picks the unit directly
+    i = min(max(int(bytes_size).bit_length() - 1, 0) // 10, len(SIZE_UNITS) - 1)
+    return f"{bytes_size / (1 << (10 * i)):.1f} {SIZE_UNITS[i]}"
+
+
+def _scandir_recursive(path):
+    """Yield a DirEntry for every regular file below path (stat results are cached)"""
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scandir_recursive(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    except PermissionError:
+        # Skip folders we can't read
+        pass
+
+
+def _stat_tree(path):
+    """Walk one folder and stat every file in it"""
+    results = []
+    for entry in _scandir_recursive(path):
+        try:
+            results.append((entry, entry.stat()))
+        except OSError:
+            # Skip files we can't read
+            pass
+    return results
+
+
+class FullDiskAccessError(Exception):
+    """The attachments folder itself can't be read (Terminal lacks Full Disk Access)"""
+
+
+def _scan_parallel(root, workers):
+    """
+    Yield (DirEntry, stat_result) for every file below root
+
+    Attachments is sharded into many top-level hash folders, so each one is
+    walked on its own thread. stat() releases the GIL, so this keeps many
+    metadata requests in flight instead of waiting on them one at a time.
+    Raises FullDiskAccessError if root can't be listed; unreadable
+    subfolders are skipped.
+    """
+    subdirs = []
+    try:
+        it = os.scandir(root)
+    except PermissionError as e:
+        raise FullDiskAccessError(str(e)) from e
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                try:
+                    yield entry, entry.stat()
+                except OSError:
+                    pass
+
+    # Walk folders on the pool but keep only a couple per thread queued, so
+    # finished results don't pile up ahead of the consumer and an interrupt
+    # doesn't wait for the whole tree; results are yielded in folder order
+    workers = max(1, workers)
+    subdirs = iter(subdirs)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for path in subdirs:
+            pending.append(executor.submit(_stat_tree, path))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            results = pending.popleft().result()
+            path = next(subdirs, None)
+            if path is not None:
+                pending.append(executor.submit(_stat_tree, path))
+            yield from results
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
-def analyze_all_files():
+def analyze_all_files(stat_threads=DEFAULT_STAT_THREADS):
     """Analyze all files in iMessage attachments"""
 
     print("=" * 80)
@@ -78,10 +152,74 @@ def analyze_all_files():
     print("This may take 1-2 minutes for large libraries...")
     print()
 
-    # Check permissions
+    # Scan and analyze all files in a single streaming pass
+    print("Scanning and analyzing all files...")
+    print()
+
+    file_count = 0
+    total_size = 0
+    ext_count = {}
+    ext_size = {}
+    category_stats = defaultdict(lambda: {'count': 0, 'size': 0})
+
+    # Only the 30 largest files are ever shown, so keep a min-heap of them
+    # rather than every file in the library
+    top_heap = []
+    video_10mb_plus = 0
+    video_50mb_plus = 0
+    video_100mb_plus = 0
+
+    bucket_counts = [0] * len(SIZE_BUCKET_NAMES)
+    bucket_sizes = [0] * len(SIZE_BUCKET_NAMES)
+
     try:
-        test_list = list(ATTACHMENTS_DIR.iterdir())
-    except PermissionError:
+        for entry, st in _scan_parallel(ATTACHMENTS_DIR, stat_threads):
+            try:
+                size = st.st_size
+                ext = os.path.splitext(entry.name)[1].lower()
+                category = EXT_TO_CATEGORY.get(ext, 'Other' if ext else 'No Extension')
+
+                file_count += 1
+                total_size += size
+
+                # Track by extension
+                ext_count[ext] = ext_count.get(ext, 0) + 1
+                ext_size[ext] = ext_size.get(ext, 0) + size
+
+                # Track by category
+                category_stats[category]['count'] += 1
+                category_stats[category]['size'] += size
+
+                if category == 'Video':
+                    if size >= 10 * 1024 * 1024:
+                        video_10mb_plus += 1
+                    if size >= 50 * 1024 * 1024:
+                        video_50mb_plus += 1
+                    if size >= 100 * 1024 * 1024:
+                        video_100mb_plus += 1
+
+                # Track by size bucket
+                bucket = bisect_right(SIZE_BUCKET_THRESHOLDS, size)
+                bucket_counts[bucket] += 1
+                bucket_sizes[bucket] += size
+
+                # Track the largest files (-file_count keeps scan order on ties)
+                if len(top_heap) < 30 or size > top_heap[0][0]:
+                    file_data = {
+                        'name': entry.name,
+                        'size': size,
+                        'category': category,
+                        'mtime': st.st_mtime
+                    }
+                    if len(top_heap) < 30:
+                        heapq.heappush(top_heap, (size, -file_count, file_data))
+                    else:
+                        heapq.heapreplace(top_heap, (size, -file_count, file_data))
+
+            except Exception as e:
+                # Skip files we can't read
+                pass
+    except FullDiskAccessError:
         print()
         print("=" * 80)
         print("PERMISSION DENIED")
@@ -89,76 +227,30 @@ def analyze_all_files():
         print()
         print("Terminal needs Full Disk Access. See README for instructions.")
         return
-
-    # Scan all files
-    print("Scanning all files...")
-    all_files = []
-    try:
-        all_files = [f for f in ATTACHMENTS_DIR.rglob('*') if f.is_file()]
     except Exception as e:
         print(f"Error scanning: {e}")
         return
 
-    if not all_files:
+    if not file_count:
         print("No files found in iMessage attachments.")
         return
 
-    print(f"Found {len(all_files):,} total files")
-    print("Analyzing...")
+    print(f"Found {file_count:,} total files")
     print()
 
-    # Analyze files
-    total_size = 0
-    extension_stats = defaultdict(lambda: {'count': 0, 'size': 0, 'files': []})
-    category_stats = defaultdict(lambda: {'count': 0, 'size': 0})
-    all_files_data = []
+    top_files = [file_data for _, _, file_data in sorted(top_heap, reverse=True)]
 
-    for file_path in all_files:
-        try:
-            size = file_path.stat().st_size
-            ext = file_path.suffix.lower() if file_path.suffix else '(no ext)'
-            category = categorize_file(ext)
-            modified = datetime.fromtimestamp(file_path.stat().st_mtime)
-
-            total_size += size
-
-            # Track by extension
-            extension_stats[ext]['count'] += 1
-            extension_stats[ext]['size'] += size
-            extension_stats[ext]['files'].append({
-                'path': file_path,
-                'size': size,
-                'modified': modified
-            })
-
-            # Track by category
-            category_stats[category]['count'] += 1
-            category_stats[category]['size'] += size
-
-            # Track all files for top N
-            all_files_data.append({
-                'path': file_path,
-                'name': file_path.name,
-                'size': size,
-                'ext': ext,
-                'category': category,
-                'modified': modified
-            })
-
-        except Exception as e:
-            # Skip files we can't read
-            pass
-
-    # Sort files by size
-    all_files_data.sort(key=lambda x: x['size'], reverse=True)
+    # Only the files we actually print need a datetime
+    for file_data in top_files:
+        file_data['modified'] = datetime.fromtimestamp(file_data['mtime'])
 
     # Print results
     print("=" * 80)
     print("OVERVIEW")
     print("=" * 80)
-    print(f"Total files: {len(all_files):,}")
+    print(f"Total files: {file_count:,}")
     print(f"Total storage: {format_size(total_size)}")
-    print(f"Average file size: {format_size(total_size / len(all_files) if all_files else 0)}")
+    print(f"Average file size: {format_size(total_size / file_count)}")
     print()
     print(f"NOTE: System Settings reports Messages using 126.6 GB")
     print(f"      We found {format_size(total_size)} in attachments")
@@ -183,15 +275,14 @@ def analyze_all_files():
     print("=" * 80)
     print("TOP FILE TYPES BY STORAGE USED")
     print("=" * 80)
-    sorted_exts = sorted(extension_stats.items(), key=lambda x: x[1]['size'], reverse=True)
+    sorted_exts = sorted(ext_size.items(), key=lambda x: x[1], reverse=True)
     print(f"{'Extension':<12} {'Files':>8} {'Total Size':>12} {'% of Total':>10} {'Avg Size':>12}")
     print("-" * 80)
-    for ext, stats in sorted_exts[:20]:
-        count = stats['count']
-        size = stats['size']
+    for ext, size in sorted_exts[:20]:
+        count = ext_count[ext]
         pct = (size / total_size * 100) if total_size > 0 else 0
         avg = size / count if count > 0 else 0
-        ext_display = ext if ext != '(no ext)' else '<none>'
+        ext_display = ext or '<none>'
         print(f"{ext_display:<12} {count:8,} {format_size(size):>12} {pct:9.1f}% {format_size(avg):>12}")
     print()
 
@@ -199,8 +290,7 @@ def analyze_all_files():
     print("=" * 80)
     print("TOP 30 LARGEST FILES")
     print("=" * 80)
-    for i, file_data in enumerate(all_files_data[:30], 1):
-        size_mb = file_data['size'] / (1024 * 1024)
+    for i, file_data in enumerate(top_files, 1):
         print(f"{i:2}. {format_size(file_data['size']):>10} - {file_data['name']}")
         print(f"    Category: {file_data['category']:<10} | Modified: {file_data['modified'].strftime('%Y-%m-%d')}")
     print()
@@ -209,30 +299,8 @@ def analyze_all_files():
     print("=" * 80)
     print("FILE SIZE DISTRIBUTION")
     print("=" * 80)
-    size_buckets = {
-        '< 1 MB': (0, 1),
-        '1-10 MB': (1, 10),
-        '10-50 MB': (10, 50),
-        '50-100 MB': (50, 100),
-        '100-500 MB': (100, 500),
-        '500+ MB': (500, float('inf'))
-    }
-
-    bucket_stats = {name: {'count': 0, 'size': 0} for name in size_buckets.keys()}
-
-    for file_data in all_files_data:
-        size_mb = file_data['size'] / (1024 * 1024)
-        for bucket_name, (min_mb, max_mb) in size_buckets.items():
-            if min_mb <= size_mb < max_mb:
-                bucket_stats[bucket_name]['count'] += 1
-                bucket_stats[bucket_name]['size'] += file_data['size']
-                break
-
-    for bucket_name in size_buckets.keys():
-        stats = bucket_stats[bucket_name]
-        count = stats['count']
-        size = stats['size']
-        pct = (count / len(all_files_data) * 100) if all_files_data else 0
+    for bucket_name, count, size in zip(SIZE_BUCKET_NAMES, bucket_counts, bucket_sizes):
+        pct = count / file_count * 100
         size_pct = (size / total_size * 100) if total_size > 0 else 0
         print(f"{bucket_name:12} : {count:6,} files ({pct:5.1f}%) | {format_size(size):>10} ({size_pct:5.1f}%)")
     print()
@@ -259,12 +327,9 @@ def analyze_all_files():
 
     if video_size > 10 * 1024 * 1024 * 1024:  # > 10 GB
         print(f"📹 VIDEOS: {format_size(video_size)} ({video_count:,} files)")
-        video_10mb_plus = sum(1 for f in all_files_data if f['category'] == 'Video' and f['size'] >= 10*1024*1024)
         print(f"   - {video_10mb_plus:,} videos are >= 10 MB")
         print(f"   - Reviewing all would take {video_10mb_plus * 0.5:.0f}-{video_10mb_plus:.0f} minutes")
         print(f"   - SUGGESTION: Focus on videos >= 50 MB or 100 MB instead")
-        video_50mb_plus = sum(1 for f in all_files_data if f['category'] == 'Video' and f['size'] >= 50*1024*1024)
-        video_100mb_plus = sum(1 for f in all_files_data if f['category'] == 'Video' and f['size'] >= 100*1024*1024)
         print(f"     - Videos >= 50 MB: {video_50mb_plus:,} files")
         print(f"     - Videos >= 100 MB: {video_100mb_plus:,} files")
         print()
@@ -295,8 +360,8 @@ def analyze_all_files():
 
     print()
     print(f"3. Quick wins - manually review top 30 largest files shown above")
-    if all_files_data:
-        top_30_size = sum(f['size'] for f in all_files_data[:30])
+    if top_files:
+        top_30_size = sum(f['size'] for f in top_files)
         print(f"   - Top 30 files = {format_size(top_30_size)}")
         print(f"   - Reviewing just 30 files could free up significant space")
 
@@ -306,8 +371,13 @@ def analyze_all_files():
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Analyze all files in iMessage attachments')
+    parser.add_argument('--stat-threads', type=int, default=DEFAULT_STAT_THREADS,
+                        help='Number of threads used to scan and stat files (default: 32)')
+    args = parser.parse_args()
+
     try:
-        analyze_all_files()
+        analyze_all_files(args.stat_threads)
     except KeyboardInterrupt:
         print("\n\nAnalysis cancelled by user.")
         sys.exit(1)
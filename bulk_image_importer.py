@@ -18,12 +18,19 @@ Author: Created for safe cleanup of Messages storage
 """
 
 import os
+import re
 import sys
+import errno
+import hashlib
+import time
+import sqlite3
 import subprocess
 import shutil
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from collections import namedtuple, deque
+from functools import partial, lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait
 from PIL import Image
 
 # Configuration
@@ -35,34 +42,254 @@ DESKTOP = Path.home() / 'Desktop'
 REVIEW_DIR = DESKTOP / 'iMessage_Images_REVIEW'
 IMPORT_LOG = DESKTOP / 'iMessage_Image_Import_Log.txt'
 
+# Remembers files already imported to Photos across runs
+IMPORT_CACHE = Path.home() / '.cache' / 'bulk_image_importer.sqlite'
+
+# Where the compiled import script is written
+IMPORT_SCRIPT_DIR = Path.home() / '.cache'
+
+# Imports every path given as an argument, one result line per path.
+# skip check duplicates true = no dialogs for duplicates
+IMPORT_SCRIPT = '''on run argv
+    set results to {}
+    tell application "Photos"
+        repeat with imgPath in argv
+            try
+                with timeout of 30 seconds
+                    import (POSIX file (imgPath as text)) skip check duplicates true
+                end timeout
+                set end of results to "success"
+            on error errMsg number errNum
+                set end of results to errMsg
+            end try
+        end repeat
+    end tell
+    set AppleScript's text item delimiters to linefeed
+    return results as text
+end run
+'''
+
 # Image extensions to process
 IMAGE_EXTENSIONS = [
     '.jpg', '.jpeg', '.png', '.gif', '.heic', '.heif',
     '.bmp', '.tiff', '.tif', '.webp', '.svg'
 ]
+# Suffix as found on disk -> canonical lowercase extension. Both common
+# spellings are listed so most image names match without a .lower() copy
+EXT_MAP = {}
+for _ext in IMAGE_EXTENSIONS:
+    EXT_MAP[_ext.lower()] = _ext.lower()
+    EXT_MAP[_ext.upper()] = _ext.lower()
+
+# Canonical extension -> slot in the per-extension count/size lists
+EXT_INDEX = {ext.lower(): i for i, ext in enumerate(IMAGE_EXTENSIONS)}
+
+# Threads used to walk and stat the attachments tree
+DEFAULT_STAT_THREADS = 32
+
+# Units for format_size, each 1024x the previous
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Images sent to Photos per osascript call
+IMPORT_GROUP_SIZE = 50
+
+# osascript imports run at once (1 = one group at a time)
+DEFAULT_IMPORT_WORKERS = 1
+
+# Skip small files (GIFs, emojis, memojis, thumbnails, etc.)
+# Only process files that contribute meaningfully to storage issues
+# Real full-resolution photos are typically > 1 MB
+MIN_IMAGE_SIZE = 1 * 1024 * 1024
+
+# Common burst photo indicators in file names: _burst, burst_, -burst, burst-
+BURST_RE = re.compile(r'[_-]burst|burst[_-]', re.IGNORECASE)
+
+# Trailing markers of complete files, checked instead of a full decode
+END_MARKERS = {
+    'JPEG': b'\xff\xd9',  # EOI
+    'PNG': b'IEND',
+}
+
+# Leading bytes compared before fully hashing same-size files for duplicates
+DEDUP_PREFIX_BYTES = 64 * 1024
+
+# Format each extension's contents should sniff as (see _sniff_format)
+EXT_FORMAT = {
+    '.jpg': 'JPEG', '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.gif': 'GIF',
+    '.webp': 'WEBP',
+    '.heic': 'HEIF', '.heif': 'HEIF',
+    '.tiff': 'TIFF', '.tif': 'TIFF',
+    '.bmp': 'BMP',
+}
+
+# ISO base media brands used by HEIC/HEIF stills
+HEIF_BRANDS = frozenset({b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1'})
+
+# Threads used to validate images with PIL (one per core)
+DEFAULT_VALIDATE_WORKERS = os.cpu_count() or 1
+
+# One record per image found; a tuple is far smaller than a dict per file.
+# path is a plain string, Path objects are only built where a caller needs one.
+# fingerprint is (st_dev, st_ino, st_size, st_mtime_ns), the import cache key
+ImageFile = namedtuple('ImageFile', ['path', 'size', 'ext', 'fingerprint'])
+
+# Closing report, rendered once and written to both the console and the log
+FINAL_SUMMARY = """
+{rule}
+IMPORT COMPLETE!
+{rule}
+Total images: {total:,}
+Imported to Photos: {imported:,}
+Moved to review folder: {moved:,}
+{skipped_line}Failed (not imported or moved): {failed:,}
+
+Review folder: {review_dir}
+Detailed log: {import_log}
+
+{rule}
+NEXT STEPS:
+{rule}
+
+1. Open Photos app and verify images are there
+
+2. MERGE DUPLICATE PHOTOS (takes ~5 minutes):
+   a. In Photos, click 'Albums' in the sidebar
+   b. Scroll down to the 'Utilities' section
+   c. Click the 'Duplicates' album
+   d. You'll see sets of duplicate photos
+   e. Click 'Merge' for each duplicate set
+      (or 'Merge All' if available in your macOS version)
+   f. This will merge duplicates while preserving all metadata
+
+3. Verify everything looks good in Photos
+
+4. When satisfied, delete the review folder:
+   rm -rf '{review_dir}'
+
+{rule}
+"""
 
 
 def format_size(bytes_size):
     """Format bytes to human-readable size"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024.0:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024.0
-    return f"{bytes_size:.1f} TB"
+    # Each unit is 10 more bits, so the bit length picks the unit directly
+    i = min(max(int(bytes_size).bit_length() - 1, 0) // 10, len(SIZE_UNITS) - 1)
+    return f"{bytes_size / (1 << (10 * i)):.1f} {SIZE_UNITS[i]}"
+
+
+# Last (second, formatted timestamp) used by log_message
+_last_timestamp = (None, '')
+
+
+def _log_timestamp():
+    """Return the log timestamp, only reformatting when the second changes"""
+    global _last_timestamp
+    now = int(time.time())
+    if now != _last_timestamp[0]:
+        _last_timestamp = (now, datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S'))
+    return _last_timestamp[1]
 
 
 def log_message(message, log_file=None):
-    """Log message to console and optionally to file"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_entry = f"[{timestamp}] {message}"
+    """Log message to console and optionally to an open log file"""
+    log_entry = f"[{_log_timestamp()}] {message}"
     print(log_entry)
     if log_file:
-        with open(log_file, 'a') as f:
-            f.write(log_entry + '\n')
+        log_file.write(log_entry + '\n')
+
 
+def _scandir_recursive(path):
+    """Yield a DirEntry for every regular file below path (stat results are cached)"""
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scandir_recursive(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    except PermissionError:
+        # Skip folders we can't read
+        pass
+
+
+def _image_entries(entries):
+    """Return (path, ext, stat_result) for every image file among the given DirEntries"""
+    results = []
+    for entry in entries:
+        suffix = os.path.splitext(entry.name)[1]
+        # Fall back to lowercasing only for mixed-case suffixes like .Jpg
+        ext = EXT_MAP.get(suffix) or EXT_MAP.get(suffix.lower())
+        if ext is None:
+            continue
+        try:
+            results.append((entry.path, ext, entry.stat()))
+        except Exception as e:
+            print(f"Warning: Could not process {entry.name}: {e}")
+    return results
+
+
+def _scan_image_tree(path):
+    """Walk one folder and stat every image file in it"""
+    return _image_entries(_scandir_recursive(path))
+
+
+class FullDiskAccessError(Exception):
+    """The attachments folder itself can't be read (Terminal lacks Full Disk Access)"""
+
+
+def _scan_images_parallel(root, workers):
+    """
+    Yield (path, ext, stat_result) for every image file below root
 
-def scan_images():
-    """Scan for all image files in iMessage attachments"""
+    Attachments is sharded into many top-level hash folders, so each one is
+    walked on its own thread to keep many directory reads in flight.
+    Raises FullDiskAccessError if root can't be listed; unreadable
+    subfolders are skipped.
+    """
+    files = []
+    subdirs = []
+    try:
+        it = os.scandir(root)
+    except PermissionError as e:
+        raise FullDiskAccessError(str(e)) from e
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                files.append(entry)
+    yield from _image_entries(files)
+
+    # Walk folders on the pool but keep only a couple per thread queued, so
+    # finished results don't pile up ahead of the consumer and an interrupt
+    # doesn't wait for the whole tree; results are yielded in folder order
+    workers = max(1, workers)
+    subdirs = iter(subdirs)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for path in subdirs:
+            pending.append(executor.submit(_scan_image_tree, path))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            results = pending.popleft().result()
+            path = next(subdirs, None)
+            if path is not None:
+                pending.append(executor.submit(_scan_image_tree, path))
+            yield from results
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_images(stat_threads=DEFAULT_STAT_THREADS):
+    """
+    Scan for all image files in iMessage attachments
+    Returns (image_files, extension_stats, scan_skipped), where scan_skipped
+    counts the burst photos and small files left out of image_files
+    """
     print("=" * 80)
     print("Bulk Image Importer - Phase 1")
     print("=" * 80)
@@ -71,14 +298,38 @@ def scan_images():
     print("This may take 1-2 minutes...")
     print()
 
-    # Check permissions
+    # Check the folder exists; read permission is checked by the scan itself
     if not ATTACHMENTS_DIR.exists():
         print(f"ERROR: Attachments directory not found: {ATTACHMENTS_DIR}")
         return None
 
+    # Find all image files
+    image_files = []
+    ext_counts = [0] * len(IMAGE_EXTENSIONS)
+    ext_sizes = [0] * len(IMAGE_EXTENSIONS)
+    scan_skipped = {'burst photo': 0, 'file too small (< 1 MB)': 0}
+
+    # Single walk of the tree; the extension test is case-insensitive so
+    # .JPG and .jpg are both found without a second pass
     try:
-        _ = list(ATTACHMENTS_DIR.iterdir())
-    except PermissionError:
+        for path, ext, st in _scan_images_parallel(ATTACHMENTS_DIR, stat_threads):
+            size = st.st_size
+
+            # Burst and small files are skipped here, before any per-batch work
+            # (Photos doesn't support duplicate bursts)
+            if is_burst_photo(path):
+                scan_skipped['burst photo'] += 1
+                continue
+            if size < MIN_IMAGE_SIZE:
+                scan_skipped['file too small (< 1 MB)'] += 1
+                continue
+
+            fingerprint = (st.st_dev, st.st_ino, size, st.st_mtime_ns)
+            image_files.append(ImageFile(path, size, ext, fingerprint))
+            i = EXT_INDEX[ext]
+            ext_counts[i] += 1
+            ext_sizes[i] += size
+    except FullDiskAccessError:
         print("=" * 80)
         print("PERMISSION DENIED")
         print("=" * 80)
@@ -87,38 +338,23 @@ def scan_images():
         print("See README for instructions on how to grant access.")
         return None
 
-    # Find all image files
-    image_files = []
-    extension_stats = defaultdict(lambda: {'count': 0, 'size': 0})
-
-    for ext in IMAGE_EXTENSIONS:
-        found = list(ATTACHMENTS_DIR.rglob(f'*{ext}'))
-        found.extend(ATTACHMENTS_DIR.rglob(f'*{ext.upper()}'))
-
-        for img_path in found:
-            try:
-                size = img_path.stat().st_size
-                image_files.append({
-                    'path': img_path,
-                    'size': size,
-                    'ext': ext
-                })
-                extension_stats[ext]['count'] += 1
-                extension_stats[ext]['size'] += size
-            except Exception as e:
-                print(f"Warning: Could not process {img_path.name}: {e}")
+    extension_stats = {
+        ext.lower(): {'count': ext_counts[i], 'size': ext_sizes[i]}
+        for i, ext in enumerate(IMAGE_EXTENSIONS)
+        if ext_counts[i]
+    }
 
-    return image_files, extension_stats
+    return image_files, extension_stats, scan_skipped
 
 
-def show_summary(image_files, extension_stats):
+def show_summary(image_files, extension_stats, scan_skipped):
     """Display summary of found images"""
     if not image_files:
-        print("No image files found in iMessage attachments.")
+        print("No image files to import found in iMessage attachments.")
         return False
 
     total_count = len(image_files)
-    total_size = sum(img['size'] for img in image_files)
+    total_size = sum(img.size for img in image_files)
 
     print("=" * 80)
     print("FOUND IMAGES")
@@ -137,6 +373,14 @@ def show_summary(image_files, extension_stats):
         print(f"  {ext:8} : {count:6,} files | {format_size(size):>10} ({pct:5.1f}%)")
     print()
 
+    if any(scan_skipped.values()):
+        print("Left in Messages (not imported):")
+        print("-" * 80)
+        for reason, count in scan_skipped.items():
+            if count:
+                print(f"  {reason:24} : {count:6,} files")
+        print()
+
     return True
 
 
@@ -186,13 +430,43 @@ def is_burst_photo(img_path):
     Check if a photo is part of a burst sequence
     Burst photos have special patterns in filenames
     """
-    filename = img_path.name.lower()
-    # Common burst photo indicators
-    burst_patterns = ['_burst', 'burst_', '-burst', 'burst-']
-    return any(pattern in filename for pattern in burst_patterns)
+    return BURST_RE.search(os.path.basename(img_path)) is not None
 
 
-def validate_image(img_path):
+def _has_end_marker(img_path, img_format):
+    """
+    Check that a JPEG or PNG isn't cut short by looking for its end marker
+    Only the last few KB are read; other formats are not checked
+    """
+    marker = END_MARKERS.get(img_format)
+    if marker is None:
+        return True
+    with open(img_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        return marker in f.read()
+
+
+def _sniff_format(header):
+    """Identify an image format from the first 12 bytes of a file, or None"""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'TIFF'
+    if header.startswith(b'BM'):
+        return 'BMP'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    if header[4:8] == b'ftyp' and header[8:12] in HEIF_BRANDS:
+        return 'HEIF'
+    return None
+
+
+def validate_image(img_path, thorough=False):
     """
     Check if an image file is valid and can be opened
     Returns (is_valid, skip_reason)
@@ -201,42 +475,51 @@ def validate_image(img_path):
 
     This is AGGRESSIVE filtering to prevent ANY file that might trigger
     a Photos dialog. Better to skip and leave in Messages than show dialogs.
+
+    By default only the header is parsed and the file's end marker checked
+    (falling back to a full decode when the marker isn't near the end);
+    thorough=True also decodes every pixel with verify() and load().
     """
-    # Check if it's a burst photo (Photos doesn't support duplicate bursts)
-    if is_burst_photo(img_path):
-        return False, "burst photo"
+    # Burst photos and small files never get here: scan_images() leaves
+    # them out using the file name and size it already has
 
-    # Check file size - if 0 bytes or too small, skip
-    try:
-        file_size = img_path.stat().st_size
-        if file_size == 0:
-            return False, "zero byte file"
-        if file_size < 100:  # Less than 100 bytes is suspicious
-            return False, "file too small"
-        # Skip small files (GIFs, emojis, memojis, thumbnails, etc.)
-        # Only process files that contribute meaningfully to storage issues
-        # Real full-resolution photos are typically > 1 MB
-        if file_size < 1 * 1024 * 1024:  # Less than 1 MB
-            return False, "file too small (< 1 MB)"
-    except Exception:
-        return False, "cannot read file"
+    # Reject files whose contents don't match their extension before
+    # handing them to PIL (misnamed or corrupt files confuse Photos)
+    expected_format = EXT_FORMAT.get(os.path.splitext(img_path)[1].lower())
+    if expected_format is not None:
+        try:
+            with open(img_path, 'rb') as f:
+                header = f.read(12)
+        except OSError:
+            return False, "cannot read file"
+        if _sniff_format(header) != expected_format:
+            return False, "contents don't match extension"
 
     # Check if file is valid/not corrupted
     try:
+        if thorough:
+            with Image.open(img_path) as img:
+                img.verify()  # Verify it's a valid image
+
+        # Open (again, verify() closes the file) to check image properties
         with Image.open(img_path) as img:
-            # Get format before verify
             img_format = img.format
 
-            img.verify()  # Verify it's a valid image
-
-        # Re-open to check image properties (verify() closes the file)
-        with Image.open(img_path) as img:
-            # Try to load the image data - this catches more corruption
-            try:
-                img.load()
-            except Exception as e:
-                # If load fails, this file will cause Photos issues
-                return False, f"cannot load image data ({type(e).__name__})"
+            if thorough:
+                # Try to load the image data - this catches more corruption
+                try:
+                    img.load()
+                except Exception as e:
+                    # If load fails, this file will cause Photos issues
+                    return False, f"cannot load image data ({type(e).__name__})"
+            elif not _has_end_marker(img_path, img_format):
+                # No end marker near the tail: either truncated, or valid with
+                # data appended (motion photos, embedded video, vendor trailers).
+                # Only these files pay for a full decode to tell the two apart
+                try:
+                    img.load()
+                except Exception as e:
+                    return False, f"truncated file ({type(e).__name__})"
 
             # Check if image has valid dimensions
             if img.size[0] == 0 or img.size[1] == 0:
@@ -273,134 +556,361 @@ def validate_image(img_path):
         return False, f"invalid/corrupted ({type(e).__name__})"
 
 
-def process_batch(batch, batch_num, total_batches, log_file):
+@lru_cache(maxsize=None)
+def _import_script():
+    """
+    Compile IMPORT_SCRIPT once per run and return the path osascript should run
+    Falls back to the plain-text source (compiled on every call) if
+    osacompile isn't available or fails
+    """
+    IMPORT_SCRIPT_DIR.mkdir(parents=True, exist_ok=True)
+    source = IMPORT_SCRIPT_DIR / 'bulk_image_importer_import.applescript'
+    compiled = IMPORT_SCRIPT_DIR / 'bulk_image_importer_import.scpt'
+    source.write_text(IMPORT_SCRIPT)
+    try:
+        subprocess.run(
+            ['osacompile', '-o', str(compiled), str(source)],
+            capture_output=True,
+            check=True,
+            timeout=30
+        )
+        return str(compiled)
+    except (OSError, subprocess.SubprocessError):
+        return str(source)
+
+
+def import_to_photos(img_paths):
+    """
+    Import a group of images to Photos with a single osascript call
+    Returns (outputs, error_detail):
+    - (list, None) with one entry per path: "success" or Photos' error message
+    - (None, stderr) if the script as a whole failed
+
+    Each file still gets its own try block so one bad file doesn't stop the
+    rest of the group, but the osascript start-up and Apple Event connection
+    to Photos are paid once per group instead of once per file. Paths are
+    passed as arguments to the precompiled script, so they need no escaping.
+    """
+    result = subprocess.run(
+        ['osascript', _import_script(), *img_paths],
+        capture_output=True,
+        text=True,
+        timeout=35 * len(img_paths)
+    )
+
+    # Errors are returned in stdout, one line per file
+    outputs = result.stdout.rstrip('\n').split('\n') if result.stdout else []
+    if len(outputs) != len(img_paths):
+        return None, result.stderr.strip() if result.stderr else "No error message"
+    return outputs, None
+
+
+def open_import_cache():
+    """
+    Open the cache of files already imported to Photos
+    A rerun after an interrupted batch uses it to move those files without
+    sending them to Photos again. Returns None if the cache can't be opened,
+    in which case every file is simply imported as before.
+    """
+    try:
+        IMPORT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(IMPORT_CACHE))
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS imported ('
+            'dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, '
+            'PRIMARY KEY (dev, ino, size, mtime_ns))'
+        )
+        return conn
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: Could not open import cache {IMPORT_CACHE}: {e}")
+        return None
+
+
+def cached_imports(import_cache, fingerprints):
+    """Return the subset of fingerprints already recorded as imported"""
+    if import_cache is None or not fingerprints:
+        return set()
+
+    wanted = set(fingerprints)
+    inodes = list({fp[1] for fp in wanted})
+    found = set()
+    try:
+        # Stay well under SQLite's limit on bound parameters per query
+        for start in range(0, len(inodes), 500):
+            chunk = inodes[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = import_cache.execute(
+                f'SELECT dev, ino, size, mtime_ns FROM imported WHERE ino IN ({placeholders})',
+                chunk
+            )
+            found.update(row for row in rows if row in wanted)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not read import cache: {e}")
+        return set()
+    return found
+
+
+def record_imports(import_cache, fingerprints):
+    """Remember that these files are now in Photos"""
+    if import_cache is None or not fingerprints:
+        return
+    try:
+        with import_cache:
+            import_cache.executemany(
+                'INSERT OR IGNORE INTO imported VALUES (?, ?, ?, ?)', fingerprints
+            )
+    except sqlite3.Error as e:
+        print(f"Warning: Could not update import cache: {e}")
+
+
+def _move_file(src, dst):
+    """
+    Move a file, renaming in place when source and target share a volume
+    Falls back to shutil.move (copy + delete) only for cross-device moves
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+
+def start_validation(batch, import_cache=None, validator=None, thorough=False):
+    """
+    Look up a batch in the import cache and start validating the rest
+    Returns (already_imported, to_validate, validations) for process_batch
+
+    With a validator pool the work is submitted right away, so
+    calling this for the next batch lets it validate while the current
+    batch is importing. thorough selects full decoding (see validate_image).
+    """
+    # Files imported on an earlier (interrupted) run only need moving
+    already_imported = cached_imports(import_cache, [img_data.fingerprint for img_data in batch])
+    to_validate = [img_data for img_data in batch if img_data.fingerprint not in already_imported]
+
+    paths = [img_data.path for img_data in to_validate]
+    check = partial(validate_image, thorough=thorough)
+    if validator is not None:
+        validations = validator.map(check, paths)
+    else:
+        validations = map(check, paths)
+    return already_imported, to_validate, validations
+
+
+def process_batch(batch, batch_num, total_batches, log_file, created_dirs, validation,
+                  import_cache=None, import_workers=DEFAULT_IMPORT_WORKERS):
     """
     Process one batch: import to Photos, then immediately move from Messages
     This avoids filling up disk space
+
+    created_dirs is shared across batches so each review subfolder is
+    only created once per run. validation comes from start_validation();
+    files it found in import_cache were imported on an earlier run and
+    are only moved.
     """
     batch_size = len(batch)
     imported = 0
     failed = 0
     moved = 0
-    failed_files = []
+    failed_files = set()
     skipped = 0
 
     print(f"\nBatch {batch_num}/{total_batches} ({batch_size} images)")
     print(f"  Step 1/2: Validating and importing to Photos...")
 
-    # Import each image in the batch
-    for i, img_data in enumerate(batch):
-        img_path = img_data['path']
+    already_imported, to_validate, validations = validation
+    if already_imported:
+        imported += len(already_imported)
+        print(f"    {len(already_imported)} images were already imported on a previous run")
 
-        # First, validate the image file
-        is_valid, skip_reason = validate_image(img_path)
+    # First, validate the image files
+    to_import = []
+    to_import_fingerprints = []
+    for img_data, (is_valid, skip_reason) in zip(to_validate, validations):
+        img_path = img_data.path
         if not is_valid:
             skipped += 1
-            failed_files.append(str(img_path))
-            log_message(f"  SKIPPED ({skip_reason}): {img_path.name}", log_file)
+            failed_files.add(img_path)
+            log_message(f"  SKIPPED ({skip_reason}): {os.path.basename(img_path)}", log_file)
             continue
+        to_import.append(img_path)
+        to_import_fingerprints.append(img_data.fingerprint)
+
+    # Import to Photos in groups, one osascript call per group. With more
+    # than one import worker, several groups are sent to Photos at once;
+    # results are still handled in order. Only import_workers groups are in
+    # flight at a time, so an interrupt leaves no queue of imports behind
+    # whose results would never be recorded
+    starts = iter(range(0, len(to_import), IMPORT_GROUP_SIZE))
+    in_flight = deque()
+    executor = ThreadPoolExecutor(max_workers=max(1, import_workers))
+
+    def submit_next():
+        start = next(starts, None)
+        if start is not None:
+            in_flight.append((start, executor.submit(
+                import_to_photos, to_import[start:start + IMPORT_GROUP_SIZE])))
 
-        try:
-            # Import to Photos using AppleScript
-            # skip check duplicates true = no dialogs for duplicates
-            # Escape quotes and backslashes for AppleScript
-            safe_path = str(img_path).replace('\\', '\\\\').replace('"', '\\"')
-
-            # Use a simpler approach - just try to import and check return code
-            script = f'''
-                try
-                    tell application "Photos"
-                        with timeout of 30 seconds
-                            import POSIX file "{safe_path}" skip check duplicates true
-                        end timeout
-                    end tell
-                    return "success"
-                on error errMsg number errNum
-                    return errMsg
-                end try
-            '''
-            result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True,
-                text=True,
-                timeout=35
-            )
-
-            # Check result - errors are returned in stdout
-            output = result.stdout.strip() if result.stdout else ""
-            output_lower = output.lower()
-
-            if output == "success" or output == "":
-                # Success - either explicit success or no output means it worked
-                imported += 1
-                if (i + 1) % 50 == 0:
-                    print(f"    Processed {i + 1}/{batch_size} from this batch...")
-            elif "burst" in output_lower:
-                # Burst photo - skip it
-                skipped += 1
-                failed_files.append(str(img_path))
-                log_message(f"  SKIPPED (burst photo): {img_path.name}", log_file)
-            elif "media item id" in output_lower:
-                # Photo is already in Photos! This is success
-                imported += 1
-                if (i + 1) % 50 == 0:
-                    print(f"    Processed {i + 1}/{batch_size} from this batch...")
-            elif "unknown error" in output_lower or "cannot import" in output_lower:
-                # Photos can't import this file - skip it
-                skipped += 1
-                failed_files.append(str(img_path))
-                log_message(f"  SKIPPED (Photos rejected: {output}): {img_path.name}", log_file)
-            elif len(output) > 0:
-                # Some other error was returned
-                skipped += 1
-                failed_files.append(str(img_path))
-                log_message(f"  SKIPPED ({output}): {img_path.name}", log_file)
-            else:
-                # Failed for unknown reason
-                failed += 1
-                failed_files.append(str(img_path))
-                error_detail = result.stderr if result.stderr else "No error message"
-                log_message(f"  FAILED to import: {img_path.name} - Error: {error_detail}", log_file)
+    try:
+        for _ in range(max(1, import_workers)):
+            submit_next()
+        while in_flight:
+            start, future = in_flight.popleft()
+            # Queue the next group only once this one has finished
+            wait([future])
+            submit_next()
+            group = to_import[start:start + IMPORT_GROUP_SIZE]
+            group_fingerprints = to_import_fingerprints[start:start + IMPORT_GROUP_SIZE]
 
-        except Exception as e:
-            failed += 1
-            failed_files.append(str(img_path))
-            log_message(f"  ERROR importing {img_path.name}: {e}", log_file)
+            try:
+                outputs, error_detail = future.result()
+            except Exception as e:
+                for img_path in group:
+                    failed += 1
+                    failed_files.add(img_path)
+                    log_message(f"  ERROR importing {os.path.basename(img_path)}: {e}", log_file)
+                continue
+
+            if outputs is None:
+                # The script itself failed, so no file in the group is known to be imported
+                for img_path in group:
+                    failed += 1
+                    failed_files.add(img_path)
+                    log_message(f"  FAILED to import: {os.path.basename(img_path)} - Error: {error_detail}", log_file)
+                continue
+
+            newly_imported = []
+            for img_path, fingerprint, output in zip(group, group_fingerprints, outputs):
+                output = output.strip()
+                output_lower = output.lower()
+
+                if output == "success" or output == "":
+                    imported += 1
+                    newly_imported.append(fingerprint)
+                elif "burst" in output_lower:
+                    # Burst photo - skip it
+                    skipped += 1
+                    failed_files.add(img_path)
+                    log_message(f"  SKIPPED (burst photo): {os.path.basename(img_path)}", log_file)
+                elif "media item id" in output_lower:
+                    # Photo is already in Photos! This is success
+                    imported += 1
+                    newly_imported.append(fingerprint)
+                elif "unknown error" in output_lower or "cannot import" in output_lower:
+                    # Photos can't import this file - skip it
+                    skipped += 1
+                    failed_files.add(img_path)
+                    log_message(f"  SKIPPED (Photos rejected: {output}): {os.path.basename(img_path)}", log_file)
+                else:
+                    # Some other error was returned
+                    skipped += 1
+                    failed_files.add(img_path)
+                    log_message(f"  SKIPPED ({output}): {os.path.basename(img_path)}", log_file)
+
+            record_imports(import_cache, newly_imported)
+            print(f"    Processed {start + len(group)}/{len(to_import)} valid images from this batch...")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
     print(f"  Step 2/2: Moving from Messages to review folder...")
 
     # Immediately move imported images from Messages to review folder
-    for img_data in batch:
-        img_path = img_data['path']
+    moved = move_to_review(
+        [img_data.path for img_data in batch if img_data.path not in failed_files],
+        created_dirs, log_file
+    )
 
-        # Skip files that failed to import
-        if str(img_path) in failed_files:
-            continue
+    if skipped > 0:
+        print(f"  ✓ Batch complete: {imported} imported, {moved} moved, {skipped} skipped (burst/invalid), {failed} failed")
+    else:
+        print(f"  ✓ Batch complete: {imported} imported, {moved} moved, {failed} failed")
 
-        try:
-            # Create subdirectory structure to avoid name conflicts
-            rel_path = img_path.relative_to(ATTACHMENTS_DIR)
-            target_path = REVIEW_DIR / rel_path
+    return imported, failed, moved, skipped, failed_files
 
-            # Create parent directories
-            target_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Move the file
-            shutil.move(str(img_path), str(target_path))
-            moved += 1
+def move_to_review(img_paths, created_dirs, log_file):
+    """
+    Move files from Messages to the review folder, returning how many moved
+    The subdirectory structure is kept to avoid name conflicts
+    """
+    # Work out every target up front so each new review subfolder is
+    # created exactly once
+    prefix_len = len(os.path.join(str(ATTACHMENTS_DIR), ''))
+    review_dir = str(REVIEW_DIR)
+    moves = [(img_path, os.path.join(review_dir, img_path[prefix_len:])) for img_path in img_paths]
+    for parent in {os.path.dirname(target_path) for _, target_path in moves} - created_dirs:
+        try:
+            os.makedirs(parent, exist_ok=True)
+            created_dirs.add(parent)
+        except Exception as e:
+            log_message(f"  ERROR creating folder {parent}: {e}", log_file)
 
+    moved = 0
+    for img_path, target_path in moves:
+        try:
+            _move_file(img_path, target_path)
+            moved += 1
         except Exception as e:
-            log_message(f"  ERROR moving {img_path.name}: {e}", log_file)
+            log_message(f"  ERROR moving {os.path.basename(img_path)}: {e}", log_file)
+    return moved
 
-    if skipped > 0:
-        print(f"  ✓ Batch complete: {imported} imported, {moved} moved, {skipped} skipped (burst/invalid), {failed} failed")
-    else:
-        print(f"  ✓ Batch complete: {imported} imported, {moved} moved, {failed} failed")
 
-    return imported, failed, moved, skipped, failed_files
+def _file_digest(path, limit=None):
+    """blake2b of a file's contents (or of its first limit bytes), None if unreadable"""
+    h = hashlib.blake2b()
+    try:
+        with open(path, 'rb') as f:
+            if limit is not None:
+                h.update(f.read(limit))
+            else:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
 
+def _split_by_digest(groups, workers, limit=None):
+    """Regroup same-size files by content digest, keeping groups of 2 or more"""
+    files = [img_data for group in groups for img_data in group]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        digests = executor.map(partial(_file_digest, limit=limit), [img_data.path for img_data in files])
+        regrouped = {}
+        for img_data, digest in zip(files, digests):
+            if digest is not None:
+                regrouped.setdefault((img_data.size, digest), []).append(img_data)
+    return [group for group in regrouped.values() if len(group) > 1]
 
-def process_all_images_batched(image_files, log_file):
+
+def find_exact_duplicates(image_files, workers):
+    """
+    Split image_files into (unique, duplicates)
+    duplicates is a list of (ImageFile, original_path) for byte-identical
+    copies of an earlier file. Only files sharing a size are read: first
+    their leading DEDUP_PREFIX_BYTES, then in full if those match too.
+    """
+    by_size = {}
+    for img_data in image_files:
+        by_size.setdefault(img_data.size, []).append(img_data)
+    groups = [group for group in by_size.values() if len(group) > 1]
+
+    if groups:
+        groups = _split_by_digest(groups, workers, limit=DEDUP_PREFIX_BYTES)
+    if groups:
+        groups = _split_by_digest(groups, workers)
+
+    duplicates = [(img_data, group[0].path) for group in groups for img_data in group[1:]]
+    if not duplicates:
+        return image_files, []
+    duplicate_paths = {img_data.path for img_data, _ in duplicates}
+    unique = [img_data for img_data in image_files if img_data.path not in duplicate_paths]
+    return unique, duplicates
+
+
+def process_all_images_batched(image_files, log_file, import_cache=None,
+                               import_workers=DEFAULT_IMPORT_WORKERS,
+                               validate_workers=DEFAULT_VALIDATE_WORKERS, thorough=False):
     """
     Process all images in batches to avoid filling disk
     Each batch: import → move → repeat
@@ -415,44 +925,92 @@ def process_all_images_batched(image_files, log_file):
     # Create review directory
     REVIEW_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Compile the import script now, before any import workers need it
+    _import_script()
+
+    # Byte-identical copies (the same attachment sent more than once) are
+    # imported once; the copies are moved after their original is in Photos
+    image_files, duplicates = find_exact_duplicates(image_files, validate_workers)
+
     # Process in batches of 500 images (~850 MB at a time)
     batch_size = 500
-    batches = [image_files[i:i + batch_size] for i in range(0, len(image_files), batch_size)]
+    # Batches are sliced off one at a time rather than copied up front
+    batch_starts = range(0, len(image_files), batch_size)
+    total_batches = len(batch_starts)
 
     total_imported = 0
     total_failed = 0
     total_moved = 0
     total_skipped = 0
     all_failed_files = []
+    created_dirs = {str(REVIEW_DIR)}
 
     print()
     print("=" * 80)
     print("PROCESSING IN BATCHES")
     print("=" * 80)
     print(f"Total images: {len(image_files):,}")
+    if duplicates:
+        print(f"Exact duplicates: {len(duplicates):,} (not imported again, moved after their original)")
     print(f"Batch size: {batch_size} images (~850 MB)")
-    print(f"Total batches: {len(batches)}")
+    print(f"Total batches: {total_batches}")
     print()
     print("Each batch: Validate → Import to Photos → Move from Messages → Free up space")
     print("This prevents disk from filling up!")
     print("Invalid/corrupted files and burst photos will be skipped (no dialogs).")
     print()
 
-    for batch_num, batch in enumerate(batches, 1):
-        imported, failed, moved, skipped, failed_files = process_batch(
-            batch, batch_num, len(batches), log_file
-        )
+    # Validation runs on a thread pool that lives for the whole run. It is
+    # mostly small header reads now, and PIL releases the GIL while decoding
+    # for --thorough, so threads overlap well without process start-up
+    validator = ThreadPoolExecutor(max_workers=validate_workers) if validate_workers > 1 else None
+    try:
+        next_validation = None
+        if total_batches:
+            next_validation = start_validation(image_files[:batch_size], import_cache, validator, thorough)
+
+        for batch_num, start in enumerate(batch_starts, 1):
+            batch = image_files[start:start + batch_size]
+            validation = next_validation
+
+            # Queue up the next batch's validation so it runs while this one
+            # imports; the pool still finishes this batch's files first
+            next_batch = image_files[start + batch_size:start + 2 * batch_size]
+            if next_batch:
+                next_validation = start_validation(next_batch, import_cache, validator, thorough)
+
+            imported, failed, moved, skipped, failed_files = process_batch(
+                batch, batch_num, total_batches, log_file, created_dirs, validation,
+                import_cache, import_workers
+            )
+
+            total_imported += imported
+            total_failed += failed
+            total_moved += moved
+            total_skipped += skipped
+            all_failed_files.extend(failed_files)
 
-        total_imported += imported
-        total_failed += failed
-        total_moved += moved
-        total_skipped += skipped
-        all_failed_files.extend(failed_files)
+            # Get this batch's log lines on disk before starting the next one
+            log_file.flush()
+    finally:
+        if validator is not None:
+            validator.shutdown()
 
-        # Small delay between batches
-        if batch_num < len(batches):
-            import time
-            time.sleep(1)
+    # Move duplicates whose original made it into Photos; the rest stay put
+    if duplicates:
+        print()
+        print("Moving exact duplicates of imported images...")
+        not_imported = set(all_failed_files)
+        to_move = []
+        for img_data, original in duplicates:
+            if original in not_imported:
+                total_skipped += 1
+                log_message(f"  SKIPPED (duplicate of a file that wasn't imported): {os.path.basename(img_data.path)}", log_file)
+            else:
+                to_move.append(img_data.path)
+        duplicates_moved = move_to_review(to_move, created_dirs, log_file)
+        total_moved += duplicates_moved
+        log_message(f"Exact duplicates moved without re-importing: {duplicates_moved}", log_file)
 
     log_message("", log_file)
     if total_skipped > 0:
@@ -465,27 +1023,41 @@ def process_all_images_batched(image_files, log_file):
 
 def main():
     """Main execution"""
+    log_file = None
+    import_cache = None
     try:
         # Parse command line arguments
         import argparse
         parser = argparse.ArgumentParser(description='Bulk import iMessage images to Photos')
         parser.add_argument('--max-images', type=int, default=None,
                           help='Maximum number of images to process (default: all)')
+        parser.add_argument('--stat-threads', type=int, default=DEFAULT_STAT_THREADS,
+                          help='Number of threads used to scan for images (default: 32)')
+        parser.add_argument('--import-workers', type=int, default=DEFAULT_IMPORT_WORKERS,
+                          help='Number of osascript imports to run at once (default: 1). '
+                               'Photos may serialize imports internally; keep this at 3 or less')
+        parser.add_argument('--validate-workers', type=int, default=DEFAULT_VALIDATE_WORKERS,
+                          help='Number of threads used to validate images (default: one per CPU core)')
+        parser.add_argument('--thorough', action='store_true',
+                          help='Fully decode every image during validation (much slower)')
         args = parser.parse_args()
 
-        # Initialize log
-        if IMPORT_LOG.exists():
-            IMPORT_LOG.unlink()
+        # Start a fresh log; one buffered handle stays open for the whole run
+        # instead of reopening the file for every message
+        log_file = open(IMPORT_LOG, 'w', buffering=1 << 16)
 
-        log_message("Bulk Image Importer started", IMPORT_LOG)
-        log_message("", IMPORT_LOG)
+        log_message("Bulk Image Importer started", log_file)
+        log_message("", log_file)
 
         # Scan for images
-        result = scan_images()
+        result = scan_images(args.stat_threads)
         if result is None:
             return 1
 
-        image_files, extension_stats = result
+        image_files, extension_stats, scan_skipped = result
+        for reason, count in scan_skipped.items():
+            if count:
+                log_message(f"Skipped at scan ({reason}): {count:,}", log_file)
 
         # Limit number of images if requested
         if args.max_images and args.max_images < len(image_files):
@@ -496,7 +1068,7 @@ def main():
             image_files = image_files[:args.max_images]
 
         # Show summary
-        if not show_summary(image_files, extension_stats):
+        if not show_summary(image_files, extension_stats, scan_skipped):
             return 0
 
         # Get confirmation
@@ -517,91 +1089,44 @@ def main():
         print()
 
         # Process all images in batches (import → move → repeat)
+        import_cache = open_import_cache()
         imported, failed, moved, skipped, failed_files = process_all_images_batched(
-            image_files, IMPORT_LOG
+            image_files, log_file, import_cache, args.import_workers, args.validate_workers,
+            args.thorough
         )
 
-        # Final summary
-        print()
-        print("=" * 80)
-        print("COMPLETE!")
-        print("=" * 80)
-        print()
-        log_message("=" * 80, IMPORT_LOG)
-        log_message("FINAL SUMMARY", IMPORT_LOG)
-        log_message("=" * 80, IMPORT_LOG)
-        log_message(f"Total images found: {len(image_files):,}", IMPORT_LOG)
-        log_message(f"Successfully imported to Photos: {imported:,}", IMPORT_LOG)
-        log_message(f"Successfully moved to review folder: {moved:,}", IMPORT_LOG)
-        if skipped > 0:
-            log_message(f"Skipped (burst photos + invalid/corrupted): {skipped:,}", IMPORT_LOG)
-        log_message(f"Failed (not imported or moved): {failed:,}", IMPORT_LOG)
-        log_message("", IMPORT_LOG)
-        log_message(f"Review folder: {REVIEW_DIR}", IMPORT_LOG)
-        log_message(f"Detailed log: {IMPORT_LOG}", IMPORT_LOG)
-        log_message("", IMPORT_LOG)
-        log_message("NEXT STEPS:", IMPORT_LOG)
-        log_message("1. Open Photos and verify images are there", IMPORT_LOG)
-        log_message("2. Merge duplicate photos (IMPORTANT!):", IMPORT_LOG)
-        log_message("   a. In Photos, go to Albums sidebar", IMPORT_LOG)
-        log_message("   b. Scroll to 'Utilities' section", IMPORT_LOG)
-        log_message("   c. Click 'Duplicates' album", IMPORT_LOG)
-        log_message("   d. Review duplicates and click 'Merge' for each", IMPORT_LOG)
-        log_message("      (or 'Merge All' if available in newer macOS)", IMPORT_LOG)
-        log_message("   e. This preserves all metadata and edits", IMPORT_LOG)
-        log_message("3. Check the review folder to see moved images", IMPORT_LOG)
-        log_message("4. When satisfied, manually delete the review folder:", IMPORT_LOG)
-        log_message(f"   rm -rf '{REVIEW_DIR}'", IMPORT_LOG)
-        log_message("", IMPORT_LOG)
-
-        # Show on console too
-        print()
-        print("=" * 80)
-        print("IMPORT COMPLETE!")
-        print("=" * 80)
-        print(f"Total images: {len(image_files):,}")
-        print(f"Imported to Photos: {imported:,}")
-        print(f"Moved to review folder: {moved:,}")
-        if skipped > 0:
-            print(f"Skipped (burst photos + invalid/corrupted): {skipped:,}")
-        print()
-        print(f"Review folder: {REVIEW_DIR}")
-        print(f"Detailed log: {IMPORT_LOG}")
-        print()
-        print("=" * 80)
-        print("NEXT STEPS:")
-        print("=" * 80)
-        print()
-        print("1. Open Photos app and verify images are there")
-        print()
-        print("2. MERGE DUPLICATE PHOTOS (takes ~5 minutes):")
-        print("   a. In Photos, click 'Albums' in the sidebar")
-        print("   b. Scroll down to the 'Utilities' section")
-        print("   c. Click the 'Duplicates' album")
-        print("   d. You'll see sets of duplicate photos")
-        print("   e. Click 'Merge' for each duplicate set")
-        print("      (or 'Merge All' if available in your macOS version)")
-        print("   f. This will merge duplicates while preserving all metadata")
-        print()
-        print("3. Verify everything looks good in Photos")
-        print()
-        print("4. When satisfied, delete the review folder:")
-        print(f"   rm -rf '{REVIEW_DIR}'")
-        print()
-        print("=" * 80)
+        # Final summary (built once, written to console and log)
+        summary = FINAL_SUMMARY.format(
+            rule="=" * 80,
+            total=len(image_files),
+            imported=imported,
+            moved=moved,
+            skipped_line=(f"Skipped (burst photos + invalid/corrupted): {skipped:,}\n"
+                          if skipped > 0 else ""),
+            failed=failed,
+            review_dir=REVIEW_DIR,
+            import_log=IMPORT_LOG,
+        )
+        sys.stdout.write(summary)
+        log_file.write(f"[{_log_timestamp()}] FINAL SUMMARY\n{summary}")
 
         return 0
 
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.")
-        log_message("Operation cancelled by user", IMPORT_LOG)
+        log_message("Operation cancelled by user", log_file)
         return 1
     except Exception as e:
         print(f"\n\nERROR: {e}")
-        log_message(f"ERROR: {e}", IMPORT_LOG)
+        log_message(f"ERROR: {e}", log_file)
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if import_cache:
+            import_cache.close()
+        if log_file:
+            log_file.close()
 
 
 if __name__ == '__main__':
@@ -4,8 +4,8 @@ Smart Video Cleaner - Phase 2 of Messages Cleanup
 
 This script handles videos in iMessage attachments with hash-based verification:
 1. Scans for videos >= configurable size threshold (default 100MB)
-2. Calculates SHA-256 hash for each video
-3. Checks if hash exists in Photos library (proves it's there!)
+2. Checks Photos library for each video (filename + size)
+3. Calculates SHA-256 hashes to point out byte-identical copies of videos in Photos
 4. Interactive GUI to review each video
 5. Shows Photos match status with metadata
 6. Imports to Photos if needed (with verification)
@@ -28,14 +28,18 @@ Author: Created for safe cleanup of Messages storage
 
 import os
 import sys
+import errno
 import argparse
 import hashlib
 import sqlite3
 import json
 import subprocess
 import shutil
+import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from collections import defaultdict
 from typing import List, Dict, Optional
 import tkinter as tk
 from tkinter import ttk, messagebox, font
@@ -47,35 +51,94 @@ DESKTOP = Path.home() / 'Desktop'
 
 # Video extensions
 VIDEO_EXTENSIONS = ['.mov', '.mp4', '.m4v', '.avi']
+VIDEO_SUFFIXES = tuple(VIDEO_EXTENSIONS)
 
 # Output locations
 REVIEW_DIR = DESKTOP / 'iMessage_Videos_REVIEW'
 DECISIONS_JSON = DESKTOP / 'iMessage_Video_Decisions.json'
 CLEANUP_LOG = DESKTOP / 'iMessage_Video_Cleanup_Log.txt'
 
+# Imports the POSIX paths given as arguments; prints one result line per file:
+# "ok <n>" or "err <n> <message>", n counting from 1, message kept on one line
+IMPORT_SCRIPT = '''on run argv
+    set results to {}
+    tell application "Photos"
+        activate
+        repeat with i from 1 to count of argv
+            try
+                with timeout of 60 seconds
+                    import (POSIX file ((item i of argv) as text)) skip check duplicates false
+                end timeout
+                set end of results to "ok " & i
+            on error errMsg
+                set AppleScript's text item delimiters to {return, linefeed}
+                set msgParts to text items of errMsg
+                set AppleScript's text item delimiters to " "
+                set end of results to "err " & i & " " & (msgParts as text)
+            end try
+        end repeat
+    end tell
+    set AppleScript's text item delimiters to linefeed
+    return results as text
+end run
+'''
+
+# Hashes from earlier runs, keyed by path and reused while size and mtime match
+HASH_CACHE = Path.home() / '.cache' / 'imessage_video_cleaner' / 'hashes.json'
+
+# Read size for the hash loop on Pythons without hashlib.file_digest (< 3.11)
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Threads used to hash videos (file reads and SHA-256 updates on large blocks release
+# the GIL, so files hash in parallel; capped to avoid disk thrashing)
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def format_size(bytes_size):
+    """Format bytes to human-readable size"""
+    size_mb = bytes_size / (1024 * 1024)
+    if size_mb >= 1024:
+        return f"{size_mb / 1024:.1f} GB"
+    return f"{size_mb:.1f} MB"
+
 
 class VideoFile:
     """Represents a video file with hash and Photos match status"""
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, stat_result: Optional[os.stat_result] = None):
+        st = stat_result or path.stat()
         self.path = path
         self.filename = path.name
-        self.size_bytes = path.stat().st_size
+        self.size_bytes = st.st_size
         self.size_mb = self.size_bytes / (1024 * 1024)
-        self.modified_date = datetime.fromtimestamp(path.stat().st_mtime)
+        self.mtime_ns = st.st_mtime_ns
+        self.modified_date = datetime.fromtimestamp(st.st_mtime)
+        # Display strings for the review screen, formatted once
+        self.size_str = format_size(self.size_bytes)
+        self.date_str = self.modified_date.strftime('%B %d, %Y at %I:%M %p')
         self.hash: Optional[str] = None
         self.in_photos: bool = False
         self.photos_info: Optional[Dict] = None
+        self.copy_of: Optional[str] = None  # filename of an identical video found in Photos
         self.decision: Optional[str] = None  # 'remove', 'import_remove', 'keep'
 
-    def calculate_hash(self) -> str:
-        """Calculate SHA-256 hash of the file"""
-        sha256 = hashlib.sha256()
-        with open(self.path, 'rb') as f:
-            for block in iter(lambda: f.read(65536), b''):
-                sha256.update(block)
+    def calculate_hash(self) -> None:
+        """Calculate SHA-256 hash of the file and store it in self.hash"""
+        # Unbuffered: both paths below do their own large reads
+        with open(self.path, 'rb', buffering=0) as f:
+            if sys.version_info >= (3, 11):
+                # Reads into one reused buffer; readinto and update release the GIL
+                sha256 = hashlib.file_digest(f, 'sha256')
+            else:
+                sha256 = hashlib.sha256()
+                buf = bytearray(HASH_BLOCK_SIZE)
+                view = memoryview(buf)
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    sha256.update(view[:n])
         self.hash = sha256.hexdigest()
-        return self.hash
 
 
 class PhotosChecker:
@@ -85,6 +148,8 @@ class PhotosChecker:
         self.library_path = library_path
         self.db_path = library_path / 'database' / 'Photos.sqlite'
 
+        self._conn: Optional[sqlite3.Connection] = None
+
         if not self.db_path.exists():
             print(f"Warning: Photos database not found at {self.db_path}")
             print("Will not be able to verify videos are in Photos.")
@@ -92,25 +157,47 @@ class PhotosChecker:
         else:
             self.db_available = True
 
-    def check_video_in_photos(self, video: VideoFile) -> bool:
+    def _connect(self) -> sqlite3.Connection:
+        """Return the shared read-only connection to Photos.sqlite, opening it on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+            conn.execute("PRAGMA cache_size = -65536")  # 64 MB page cache
+            conn.execute("PRAGMA mmap_size = 268435456")  # read pages via mmap (256 MB)
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("CREATE TEMP TABLE video_sizes (size INTEGER PRIMARY KEY)")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the Photos database connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def check_videos_in_photos(self, videos: List[VideoFile]) -> int:
         """
-        Check if video exists in Photos by comparing file metadata
+        Check which videos exist in Photos by comparing file metadata
 
         Note: Photos doesn't store SHA-256 hashes directly in an easily accessible way.
         Instead, we'll check by filename and file size as a proxy.
         For true hash matching, we'd need to hash all videos in Photos library
         which would be very slow.
 
-        For now, we'll use a conservative approach: check by filename + size
+        One connection serves the whole batch: the candidate sizes go into an
+        indexed TEMP table (in memory, so the read-only Photos database is never
+        written), a single join fetches every asset of a matching size, and
+        filenames are matched in Python.
+        Returns the number of videos found.
         """
-        if not self.db_available:
-            return False
+        if not self.db_available or not videos:
+            return 0
 
         try:
-            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
-            cursor = conn.cursor()
+            conn = self._connect()
+            conn.execute("DELETE FROM temp.video_sizes")
+            conn.executemany("INSERT OR IGNORE INTO temp.video_sizes VALUES (?)",
+                             ((v.size_bytes,) for v in videos))
 
-            # Query for videos with matching filename
             # Photos database structure (simplified):
             # ZASSET table has basic asset info
             # ZADDITIONALASSETATTRIBUTES has file size info
@@ -121,17 +208,28 @@ class PhotosChecker:
                     ZASSET.ZDATECREATED,
                     ZADDITIONALASSETATTRIBUTES.ZORIGINALFILESIZE
                 FROM ZASSET
-                LEFT JOIN ZADDITIONALASSETATTRIBUTES
+                JOIN ZADDITIONALASSETATTRIBUTES
                     ON ZASSET.Z_PK = ZADDITIONALASSETATTRIBUTES.ZASSET
-                WHERE ZASSET.ZFILENAME LIKE ?
-                AND ZADDITIONALASSETATTRIBUTES.ZORIGINALFILESIZE = ?
+                JOIN temp.video_sizes
+                    ON ZADDITIONALASSETATTRIBUTES.ZORIGINALFILESIZE = temp.video_sizes.size
             """
 
-            cursor.execute(query, (f'%{video.filename}%', video.size_bytes))
-            results = cursor.fetchall()
+            assets_by_size = defaultdict(list)
+            for row in conn.execute(query):
+                assets_by_size[row[3]].append(row)
 
-            cursor.close()
-            conn.close()
+        except Exception as e:
+            print(f"Warning: Could not query Photos database: {e}")
+            return 0
+
+        found = 0
+        for video in videos:
+            # Match on size plus the attachment's filename: assets with exactly
+            # that name first, otherwise any whose name contains it
+            name = video.filename.lower()
+            candidates = [row for row in assets_by_size.get(video.size_bytes, ()) if row[1]]
+            results = ([row for row in candidates if row[1].lower() == name] or
+                       [row for row in candidates if name in row[1].lower()])
 
             if results:
                 # Found matching video(s) in Photos
@@ -142,13 +240,46 @@ class PhotosChecker:
                     'size': results[0][3],
                     'matches': len(results)
                 }
-                return True
+                found += 1
 
-            return False
+        return found
 
-        except Exception as e:
-            print(f"Warning: Could not query Photos database: {e}")
-            return False
+
+def load_hash_cache(cache_file: Path) -> Dict:
+    """Load cached hashes ({path: [size, mtime_ns, hash]}), empty if missing or unreadable"""
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: Could not load hash cache: {e}")
+        return {}
+
+
+def save_hash_cache(cache_file: Path, cache: Dict):
+    """Write the hash cache atomically (temp file + rename)"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=cache_file.parent, delete=False) as f:
+            json.dump(cache, f)
+        os.replace(f.name, cache_file)
+    except Exception as e:
+        print(f"Warning: Could not save hash cache: {e}")
+
+
+def _video_entries(path):
+    """Yield a DirEntry for every video file below path (stat results are cached)"""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                try:
+                    yield from _video_entries(entry.path)
+                except PermissionError:
+                    # Skip folders we can't read
+                    pass
+            elif entry.name.lower().endswith(VIDEO_SUFFIXES):
+                yield entry
 
 
 class VideoScanner:
@@ -167,10 +298,8 @@ class VideoScanner:
             raise FileNotFoundError(f"Attachments directory not found: {self.attachments_dir}")
 
         try:
-            video_files = []
-            for ext in VIDEO_EXTENSIONS:
-                video_files.extend(self.attachments_dir.rglob(f'*{ext}'))
-                video_files.extend(self.attachments_dir.rglob(f'*{ext.upper()}'))
+            # One walk of the tree, matching extensions case-insensitively
+            video_entries = list(_video_entries(self.attachments_dir))
         except PermissionError:
             print()
             print("=" * 70)
@@ -180,28 +309,82 @@ class VideoScanner:
             raise
 
         # Filter by size
-        for path in video_files:
+        for entry in video_entries:
             try:
-                if path.stat().st_size >= self.min_size_bytes:
-                    video = VideoFile(path)
+                st = entry.stat()
+                if st.st_size >= self.min_size_bytes:
+                    video = VideoFile(Path(entry.path), st)
                     self.videos.append(video)
             except Exception as e:
-                print(f"Warning: Could not process {path}: {e}")
+                print(f"Warning: Could not process {entry.path}: {e}")
 
         print(f"Found {len(self.videos)} videos >= {self.min_size_bytes / (1024*1024):.0f}MB")
         return self.videos
 
-    def calculate_hashes(self):
-        """Calculate hashes for all videos"""
-        print("Calculating file hashes...")
-        for i, video in enumerate(self.videos, 1):
-            try:
-                video.calculate_hash()
+    def calculate_hashes(self, cache_file: Optional[Path] = None, workers: int = DEFAULT_HASH_WORKERS):
+        """
+        Calculate hashes for videos that could be a copy of one found in Photos
+
+        Run after the Photos check. Two files can only match if their sizes
+        match, and a hash only changes the outcome when a same-size group mixes
+        videos found in Photos with ones that weren't, so only those groups are
+        hashed; every other video keeps hash None. With a cache_file, hashes of
+        files whose size and mtime are unchanged are reused instead of re-read.
+        """
+        by_size = defaultdict(list)
+        for video in self.videos:
+            by_size[video.size_bytes].append(video)
+        to_hash = [v for group in by_size.values()
+                   if len({g.in_photos for g in group}) > 1 for v in group]
+
+        cache = load_hash_cache(cache_file) if cache_file else {}
+        for video in to_hash:
+            cached = cache.get(str(video.path))
+            if cached and cached[0] == video.size_bytes and cached[1] == video.mtime_ns:
+                video.hash = cached[2]
+        pending = [v for v in to_hash if not v.hash]
+
+        print(f"Calculating file hashes ({len(self.videos) - len(to_hash)} videos without a same-size "
+              f"Photos match skipped, {len(to_hash) - len(pending)} cached)...")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(video.calculate_hash): video for video in pending}
+            for i, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Warning: Could not hash {futures[future].filename}: {e}")
                 if i % 10 == 0:
-                    print(f"  Progress: {i}/{len(self.videos)} videos hashed...")
-            except Exception as e:
-                print(f"Warning: Could not hash {video.filename}: {e}")
-        print(f"Hashed {len([v for v in self.videos if v.hash])}/{len(self.videos)} videos")
+                    print(f"  Progress: {i}/{len(pending)} videos hashed...")
+        print(f"Hashed {len([v for v in to_hash if v.hash])}/{len(to_hash)} videos")
+
+        if cache_file and pending:
+            for video in pending:
+                if video.hash:
+                    cache[str(video.path)] = [video.size_bytes, video.mtime_ns, video.hash]
+            save_hash_cache(cache_file, cache)
+
+    def match_copies(self) -> int:
+        """
+        Note which unmatched videos are byte-identical to one found in Photos
+
+        Only sets copy_of for the review screen; in_photos still comes from the
+        filename + size check alone, so 'Safe to Remove' isn't enabled by this.
+        """
+        by_hash = defaultdict(list)
+        for video in self.videos:
+            if video.hash:
+                by_hash[video.hash].append(video)
+
+        matched = 0
+        for group in by_hash.values():
+            original = next((v for v in group if v.in_photos), None)
+            if original is None:
+                continue
+            for video in group:
+                if not video.in_photos:
+                    video.copy_of = original.filename
+                    matched += 1
+        return matched
 
 
 class ReviewGUI:
@@ -210,6 +393,9 @@ class ReviewGUI:
     def __init__(self, videos: List[VideoFile], decisions_file: Path):
         self.videos = videos
         self.decisions_file = decisions_file
+        # Each click appends one line here; save_decisions() folds it into decisions_file
+        self.decisions_log = decisions_file.with_suffix('.jsonl')
+        self._decisions_log_fh = None
         self.current_index = 0
         self.space_freed = 0  # Track cumulative space freed
 
@@ -234,20 +420,49 @@ class ReviewGUI:
         self.setup_ui()
 
     def load_decisions(self):
-        """Load previously saved decisions"""
-        if self.decisions_file.exists():
-            try:
+        """Load previously saved decisions (the JSONL log wins over the JSON snapshot)"""
+        decisions = {}
+        try:
+            if self.decisions_file.exists():
                 with open(self.decisions_file, 'r') as f:
-                    decisions = json.load(f)
-                    for video in self.videos:
-                        if str(video.path) in decisions:
-                            video.decision = decisions[str(video.path)]
-                print(f"Loaded {len(decisions)} previous decisions")
-            except Exception as e:
-                print(f"Warning: Could not load decisions: {e}")
+                    decisions.update(json.load(f))
+            if self.decisions_log.exists():
+                with open(self.decisions_log, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Partial last line from an interrupted run
+                            continue
+                        decisions[entry['path']] = entry['decision']
+        except Exception as e:
+            print(f"Warning: Could not load decisions: {e}")
+
+        if decisions:
+            for video in self.videos:
+                if str(video.path) in decisions:
+                    video.decision = decisions[str(video.path)]
+            print(f"Loaded {len(decisions)} previous decisions")
+
+    def record_decision(self, video: VideoFile):
+        """Append a single decision to the JSONL log"""
+        if self._decisions_log_fh is None:
+            # An interrupted run can leave a partial last line; end it so the
+            # next entry isn't glued onto it and lost on the following load
+            try:
+                with open(self.decisions_log, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+            except OSError:
+                # Missing or empty log
+                needs_newline = False
+            self._decisions_log_fh = open(self.decisions_log, 'a', buffering=1)
+            if needs_newline:
+                self._decisions_log_fh.write('\n')
+        self._decisions_log_fh.write(json.dumps({'path': str(video.path), 'decision': video.decision}) + '\n')
 
     def save_decisions(self):
-        """Save decisions to JSON"""
+        """Save all decisions to JSON and drop the now-redundant JSONL log"""
         decisions = {}
         for video in self.videos:
             if video.decision:
@@ -256,6 +471,12 @@ class ReviewGUI:
         with open(self.decisions_file, 'w') as f:
             json.dump(decisions, f, indent=2)
 
+        if self._decisions_log_fh is not None:
+            self._decisions_log_fh.close()
+            self._decisions_log_fh = None
+        if self.decisions_log.exists():
+            self.decisions_log.unlink()
+
     def setup_ui(self):
         """Create the GUI layout"""
         # Progress section
@@ -358,13 +579,6 @@ class ReviewGUI:
         )
         self.finish_button.pack(side=tk.RIGHT, padx=5)
 
-    def format_size(self, bytes_size):
-        """Format bytes to human-readable size"""
-        size_mb = bytes_size / (1024 * 1024)
-        if size_mb >= 1024:
-            return f"{size_mb / 1024:.1f} GB"
-        return f"{size_mb:.1f} MB"
-
     def update_display(self):
         """Update the display with current video info"""
         if self.current_index >= len(self.videos):
@@ -379,12 +593,12 @@ class ReviewGUI:
         self.progress_bar['value'] = ((self.current_index + 1) / len(self.videos)) * 100
 
         # Update space freed
-        self.space_label.config(text=f"Space to be freed so far: {self.format_size(self.space_freed)}")
+        self.space_label.config(text=f"Space to be freed so far: {format_size(self.space_freed)}")
 
         # Update file info
         self.filename_label.config(text=f"Filename: {video.filename}")
-        self.size_label.config(text=f"Size: {self.format_size(video.size_bytes)}")
-        self.date_label.config(text=f"Modified: {video.modified_date.strftime('%B %d, %Y at %I:%M %p')}")
+        self.size_label.config(text=f"Size: {video.size_str}")
+        self.date_label.config(text=f"Modified: {video.date_str}")
 
         # Update Photos status
         if video.in_photos:
@@ -401,6 +615,8 @@ class ReviewGUI:
             status_text = "✗ NOT FOUND IN PHOTOS"
             status_color = "orange"
             info_text = "No exact match found in Photos library.\nYou should import it before removing from Messages."
+            if video.copy_of:
+                info_text += f"\nNote: byte-identical to {video.copy_of}, which was found in Photos."
             self.photos_info_label.config(text=info_text, foreground="orange")
 
             # Enable/disable buttons
@@ -420,7 +636,7 @@ class ReviewGUI:
             if decision in ['remove', 'import_remove']:
                 self.space_freed += video.size_bytes
 
-            self.save_decisions()
+            self.record_decision(video)
             self.current_index += 1
 
             # Skip already-decided videos
@@ -472,25 +688,68 @@ class ReviewGUI:
         self.root.mainloop()
 
 
-def import_to_photos(video_path: Path) -> bool:
-    """Import video to Photos using AppleScript"""
+def import_to_photos(video_paths: List[Path]) -> List[Optional[str]]:
+    """
+    Import videos to Photos using AppleScript, one osascript call for the batch
+    Returns one entry per path: None if it was imported, otherwise the reason
+    it wasn't.
+
+    Each file has its own try block in the script and its own result line.
+    The script only prints its lines once the whole run ends, so a batch
+    that timed out or produced no result lines at all (osascript died, e.g.
+    because Photos crashed or quit) is never retried: any of its videos may
+    already be in Photos, so they are reported as failed and left where they
+    are. Only when some lines came back are the paths missing one retried,
+    one at a time; a path that reported success is never sent again.
+    """
     try:
-        script = f'''
-            tell application "Photos"
-                activate
-                import POSIX file "{video_path}" skip check duplicates false
-            end tell
-        '''
         result = subprocess.run(
-            ['osascript', '-e', script],
+            ['osascript', '-e', IMPORT_SCRIPT, *map(str, video_paths)],
             capture_output=True,
             text=True,
-            timeout=60
+            # Well above the script's 60 s per file plus Photos start-up, so a
+            # slow but healthy batch isn't killed partway through
+            timeout=120 + 90 * len(video_paths)
         )
-        return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        return ["Timed out waiting for Photos (it may still have been imported)"] * len(video_paths)
     except Exception as e:
-        print(f"ERROR: Failed to import {video_path.name}: {e}")
-        return False
+        return [str(e)] * len(video_paths)
+
+    errors = {}
+    for line in result.stdout.split('\n'):
+        status, _, rest = line.partition(' ')
+        index, _, message = rest.partition(' ')
+        if status in ('ok', 'err') and index.isdigit() and 1 <= int(index) <= len(video_paths):
+            errors[int(index) - 1] = None if status == 'ok' else (message.strip() or "Unknown error")
+
+    missing = [i for i in range(len(video_paths)) if i not in errors]
+    if missing:
+        error = result.stderr.strip() or "No result from Photos"
+        if not errors:
+            return [f"{error} (it may still have been imported)"] * len(video_paths)
+        if len(video_paths) == 1:
+            errors[0] = error
+        else:
+            print(f"Warning: No import result for {len(missing)} of {len(video_paths)} videos ({error}), "
+                  "importing those one at a time...")
+            for i in missing:
+                errors[i] = import_to_photos([video_paths[i]])[0]
+
+    return [errors[i] for i in range(len(video_paths))]
+
+
+def _move_file(src: Path, dst: Path):
+    """
+    Move a file, renaming in place when source and target share a volume
+    Falls back to shutil.move (copy + delete) only for cross-device moves
+    """
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
 
 
 def execute_decisions(videos: List[VideoFile], review_dir: Path, log_file: Path):
@@ -528,17 +787,24 @@ def execute_decisions(videos: List[VideoFile], review_dir: Path, log_file: Path)
         all_to_process = to_remove + to_import_remove
         total = len(all_to_process)
 
+        # Import everything that needs it in one go
+        import_errors = {}
+        if to_import_remove:
+            print(f"Importing {len(to_import_remove)} videos to Photos...")
+            log.write(f"Importing {len(to_import_remove)} videos to Photos...\n\n")
+            results = import_to_photos([v.path for v in to_import_remove])
+            import_errors = dict(zip((v.path for v in to_import_remove), results))
+
         for i, video in enumerate(all_to_process, 1):
             print(f"[{i}/{total}] Processing: {video.filename}")
             log.write(f"[{i}/{total}] {video.filename}\n")
 
-            # Import if needed
+            # Check the import if needed
             if video.decision == 'import_remove':
-                print(f"  Importing to Photos...")
-                log.write(f"  Importing to Photos...\n")
-                if not import_to_photos(video.path):
-                    print(f"  ERROR: Import failed! Skipping.")
-                    log.write(f"  ERROR: Import failed! Skipping.\n\n")
+                error = import_errors[video.path]
+                if error:
+                    print(f"  ERROR: Import failed ({error})! Skipping.")
+                    log.write(f"  ERROR: Import failed ({error})! Skipping.\n\n")
                     continue
 
                 print(f"  ✓ Import succeeded")
@@ -561,7 +827,13 @@ def execute_decisions(videos: List[VideoFile], review_dir: Path, log_file: Path)
             print(f"  Moving to: {target_dir.name}/{target_path.name}")
             log.write(f"  Moving to: {target_dir.name}/{target_path.name}\n")
 
-            shutil.move(str(video.path), str(target_path))
+            try:
+                _move_file(video.path, target_path)
+            except OSError as e:
+                # Keep going: later videos may already be imported and still need moving
+                print(f"  ERROR: Move failed ({e})! Left in Messages.")
+                log.write(f"  ERROR: Move failed ({e})! Left in Messages.\n\n")
+                continue
             print(f"  ✓ Complete")
             log.write(f"  ✓ Complete\n\n")
 
@@ -588,6 +860,10 @@ def main():
     parser = argparse.ArgumentParser(description='Smart Video Cleaner with hash verification')
     parser.add_argument('--min-size', type=int, default=100,
                         help='Minimum video size in MB (default: 100)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Re-hash every video instead of reusing hashes from {HASH_CACHE}')
+    parser.add_argument('--hash-workers', type=int, default=DEFAULT_HASH_WORKERS,
+                        help=f'Videos hashed in parallel; use 1 for spinning disks (default: {DEFAULT_HASH_WORKERS})')
     args = parser.parse_args()
 
     print("=" * 70)
@@ -604,18 +880,19 @@ def main():
             print("No videos found meeting criteria.")
             return 0
 
-        # Calculate hashes
-        scanner.calculate_hashes()
-
         # Check against Photos library
         print("\nChecking against Photos library...")
         checker = PhotosChecker(PHOTOS_LIBRARY)
-        for video in videos:
-            if video.hash:
-                checker.check_video_in_photos(video)
-
-        in_photos_count = sum(1 for v in videos if v.in_photos)
-        print(f"Found {in_photos_count} videos already in Photos")
+        try:
+            in_photos_count = checker.check_videos_in_photos(videos)
+        finally:
+            checker.close()
+
+        # Hash only where it can extend a match to an identical copy
+        scanner.calculate_hashes(None if args.no_cache else HASH_CACHE, args.hash_workers)
+        copies = scanner.match_copies()
+        print(f"Found {in_photos_count} videos already in Photos"
+              f" ({copies} more are identical copies of a match)")
         print()
 
         # Interactive review